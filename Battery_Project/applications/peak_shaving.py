@@ -1,9 +1,9 @@
 from typing import Dict, Any
 import pandas as pd
 import numpy as np
-from battery_components.battery import BatteryParameters, BatteryModel
+from battery_components.battery import BatteryParameters
 from battery_components.solar import SolarParameters, SolarModel
-from battery_components.grid import GridParameters, GridModel
+from battery_components.grid import GridParameters
 from battery_components.optimization_engine import OptimizationEngine
 
 class PeakShavingApplication:
@@ -45,7 +45,8 @@ class PeakShavingApplication:
             lifetime_years=20,
             inverter_capacity=5.0,
             start_date=start_date,
-            end_date=end_date
+            end_date=end_date,
+            generation_profile=generation_profile
         )
 
         # Create solar model to get generation profile
@@ -54,11 +55,15 @@ class PeakShavingApplication:
 
         # Create price profile based on solar generation
         # Higher price when solar generation is low, lower price when solar generation is high
+        # Work on the raw array: one pass for the mean, one for the threshold, and
+        # float32 is plenty for the price coefficients fed to the objective
+        generation_values = generation_profile.to_numpy()
         price_profile = pd.Series(
-            np.where(generation_profile > generation_profile.mean(),
+            np.where(generation_values > generation_values.mean(),
                     offpeak_price,  # Lower price during solar hours
-                    peak_price),    # Higher price during non-solar hours
-            index=generation_profile.index
+                    peak_price).astype(np.float32),    # Higher price during non-solar hours
+            index=generation_profile.index,
+            copy=False  # the np.where result is already a fresh array
         )
 
         # Create grid parameters
@@ -77,9 +82,14 @@ class PeakShavingApplication:
             discount_rate=discount_rate
         )
 
-    def run_optimization(self) -> Dict[str, Any]:
-        """Run the optimization and return results"""
-        return self.engine.optimize()
+    def run_optimization(self, warm_start_from: 'PeakShavingApplication' = None) -> Dict[str, Any]:
+        """Run the optimization and return results
+
+        warm_start_from: earlier application in a sweep whose optimal basis seeds this solve
+        """
+        return self.engine.optimize(
+            warm_start_from=warm_start_from.engine if warm_start_from is not None else None
+        )
 
     def get_summary(self, results: Dict[str, Any]) -> Dict[str, Any]:
         """Generate a summary of the optimization results"""
@@ -1,4 +1,6 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List
+from dataclasses import replace
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 import linopy
@@ -6,8 +8,11 @@ import xarray as xr
 from battery_components.battery import BatteryParameters, BatteryModel
 from battery_components.solar import SolarParameters, SolarModel
 from battery_components.grid import GridParameters, GridModel
+from battery_components.annuity import annuity_factor
+from battery_components.objective import ObjectiveMixin
+from battery_components.warm_start import WarmStartMixin
 
-class SolarClippingApplication:
+class SolarClippingApplication(ObjectiveMixin, WarmStartMixin):
     """Peak shaving application using battery storage"""
     def __init__(
         self,
@@ -24,7 +29,8 @@ class SolarClippingApplication:
         api_token: str = None,  # Renewables.ninja API token
         start_date: str = None,  # format: 'YYYY-MM-DD'
         end_date: str = None,    # format: 'YYYY-MM-DD'
-        clip_threshold: float = 0.0  # Added for clipping functionality
+        clip_threshold: float = 0.0,  # Added for clipping functionality
+        solver_options: Dict[str, Any] = None  # extra solver settings, see WarmStartMixin
     ):
         # Create battery parameters
         self.battery_params = BatteryParameters(
@@ -49,14 +55,15 @@ class SolarClippingApplication:
             lifetime_years=20,
             inverter_capacity=inverter_capacity,
             start_date=start_date,
-            end_date=end_date
+            end_date=end_date,
+            generation_profile=generation_profile
         )
 
         # Create grid parameters
         self.grid_params = GridParameters(
             max_import=0,  # Using max_export as max_import for simplicity
             max_export=max_export,
-            price_profile=None,  # Will be set after solar model is created
+            price_profile=None,  # Built from the clipped generation in run_optimization
             connection_cost=50000  # $/MW
         )
 
@@ -65,54 +72,127 @@ class SolarClippingApplication:
         self.solar_model = SolarModel(self.solar_params)
         self.grid_model = GridModel(self.grid_params)
 
-        # Get generation profile from solar model
-        generation_profile = self.solar_model.generation_profile
+        # Create time index using the same timezone as the generation profile and
+        # align it once, so run_optimization never has to reindex; an hourly index
+        # already is the horizon, only other indexes are resampled
+        generation_index = self.solar_model.generation_profile.index
+        if generation_index.freq == 'h':
+            self._time = generation_index
+        else:
+            self._time = pd.date_range(start=generation_index[0], end=generation_index[-1], freq='h')
+        self.solar_model.align_to(self._time)
 
-        # Create price profile based on solar generation
-        # Higher price when solar generation is low, lower price when solar generation is high
-        price_profile = pd.Series(
-            np.where(generation_profile > generation_profile.mean(),
-                    offpeak_price,  # Lower price during solar hours
-                    peak_price),    # Higher price during non-solar hours
-            index=generation_profile.index
-        )
-
-        # Update grid parameters with price profile
-        self.grid_params.price_profile = price_profile
-        self.grid_model.params.price_profile = price_profile
+        # Unclipped generation; every run clips from this rather than from the
+        # previous run's already clipped profile
+        self._unclipped_generation = self.solar_model.generation_profile
 
+        self.peak_price = peak_price
+        self.offpeak_price = offpeak_price
         self.discount_rate = discount_rate
+        self._annuity_factor = annuity_factor(discount_rate, self.battery_params.lifetime_years)
         self.clip_threshold = clip_threshold
+        self.solver_options = dict(solver_options or {})
+
+        # LP structure is built once and reused across run_optimization() calls
+        self._model = None
+        self._battery_vars = None
+        self._solar_vars = None
+        self._grid_vars = None
+
+    @property
+    def unclipped_generation(self) -> pd.Series:
+        """Generation profile before clipping"""
+        return self._unclipped_generation
 
     def _apply_clipping(self, profile: pd.Series, capacity: float, threshold: float) -> pd.Series:
         """Apply clipping to the generation profile"""
-        return profile.clip(upper=threshold * capacity)
+        # Scalar bound on the raw array; pandas' clip() would align and copy first
+        clipped = np.minimum(profile.to_numpy(), threshold * capacity)
+        return pd.Series(clipped, index=profile.index, copy=False)
 
     def _calculate_clipped_energy(self, profile: pd.Series, capacity: float, threshold: float) -> float:
         """Calculate the amount of energy that would be clipped"""
-        clipped_profile = self._apply_clipping(profile, capacity, threshold)
-        return (profile - clipped_profile).sum()
+        # Clamp the excess in place so only one temporary array is allocated
+        excess = profile.to_numpy() - threshold * capacity
+        return np.maximum(excess, 0, out=excess).sum()
 
-    def run_optimization(self) -> Dict[str, Any]:
-        """Run the optimization and return results"""
-        # Modify solar generation profile to include clipping
+    def _build_price_profile(self, generation_values: np.ndarray) -> pd.Series:
+        """Price profile based on (clipped) solar generation"""
+        # Higher price when solar generation is low, lower price when solar generation is high
+        # Work on the raw array: one pass for the mean, one for the threshold, and
+        # float32 is plenty for the price coefficients fed to the objective
+        prices = np.where(generation_values > generation_values.mean(),
+                          self.offpeak_price,  # Lower price during solar hours
+                          self.peak_price).astype(np.float32)    # Higher price during non-solar hours
+        return pd.Series(prices, index=self._time, copy=False)
+
+    def run_optimization(self, warm_start_from: 'SolarClippingApplication' = None) -> Dict[str, Any]:
+        """Run the optimization and return results
+
+        warm_start_from: earlier application in a sweep whose optimal basis seeds this solve
+        """
+        # Modify solar generation profile to include clipping, and price against
+        # what is actually left after clipping
         self.solar_model.generation_profile = self._apply_clipping(
-            self.solar_model.generation_profile,
+            self._unclipped_generation,
             self.solar_params.capacity,
             self.clip_threshold
         )
-        
-        # Create time index using the same timezone as the price profile
-        time = pd.date_range(
-            start=self.grid_params.price_profile.index[0],
-            end=self.grid_params.price_profile.index[-1],
-            freq='h'
+        # Grid parameters are frozen, so the grid model gets a copy with the new prices
+        self.grid_params = replace(
+            self.grid_params,
+            price_profile=self._build_price_profile(self.solar_model.generation_profile.to_numpy())
         )
+        self.grid_model.params = self.grid_params
+
+        if self._model is None:
+            self._build_model()
+        else:
+            # Clipping only moves the generation bound, so patch it in place
+            self.solar_model.update_generation_bounds(self._solar_vars)
+        model = self._model
+        battery_vars = self._battery_vars
+        solar_vars = self._solar_vars
+        grid_vars = self._grid_vars
+
+        # Set objective
+        self._set_objective(model, battery_vars, solar_vars, grid_vars)
+
+        # Solve the model, warm-starting from the previous basis when the LP
+        # structure is unchanged
+        self._solve_warm(model, warm_start_from)
+        
+        # Extract and return results
+        results = self._extract_results(model, battery_vars, solar_vars, grid_vars)
         
-        # Ensure all time series data is aligned
-        self.solar_model.generation_profile = self.solar_model.generation_profile.reindex(time, fill_value=0)
-        self.grid_params.price_profile = self.grid_params.price_profile.reindex(time, fill_value=0)
-        self.grid_model.params.price_profile = self.grid_params.price_profile
+        # Add clipping-specific metrics
+        results['clipping'] = self.clipping_metrics()
+        
+        return results
+
+    def clipping_metrics(self, clip_threshold: float = None) -> Dict[str, float]:
+        """Clip threshold and clipped energy of the current settings
+
+        Closed-form on the generation profile, so available without solving.
+        clip_threshold: evaluate this threshold instead, leaving the application unchanged
+        """
+        if clip_threshold is None:
+            clip_threshold = self.clip_threshold
+        return {
+            'threshold': clip_threshold,
+            'clipped_energy': self._calculate_clipped_energy(
+                self._unclipped_generation,
+                self.solar_params.capacity,
+                clip_threshold
+            )
+        }
+
+    def _build_model(self) -> None:
+        """Build variables and constraints once and cache them on the application"""
+        # Own copy of the horizon named after the model dimension: the profiles
+        # share self._time, and callers (e.g. chart helpers) may rename their
+        # index in place
+        time = self._time.rename('time')
 
         # Initialize optimization model
         model = linopy.Model()
@@ -142,26 +222,17 @@ class SolarClippingApplication:
             name='inverter_capacity'
         )
 
-        # Set objective
-        self._set_objective(model, battery_vars, solar_vars, grid_vars)
+        self._model = model
+        self._battery_vars = battery_vars
+        self._solar_vars = solar_vars
+        self._grid_vars = grid_vars
 
-        # Solve the model
-        model.solve()
-        
-        # Extract and return results
-        results = self._extract_results(model, battery_vars, solar_vars, grid_vars)
-        
-        # Add clipping-specific metrics
-        results['clipping'] = {
-            'threshold': self.clip_threshold,
-            'clipped_energy': self._calculate_clipped_energy(
-                self.solar_model.generation_profile,
-                self.solar_params.capacity,
-                self.clip_threshold
-            )
-        }
-        
-        return results
+    def invalidate_model(self) -> None:
+        """Discard the cached LP so the next run_optimization() rebuilds it"""
+        # Needed after changing anything structural (battery/solar/grid parameters or
+        # horizon); prices and clip threshold are applied to the cached model
+        self._model = None
+        self._invalidate_basis()
 
     def _set_objective(
         self,
@@ -171,62 +242,11 @@ class SolarClippingApplication:
         grid_vars: Dict[str, xr.DataArray]
     ) -> None:
         """Set the optimization objective"""
-        # Calculate annuity factor
-        annuity_factor = (self.discount_rate * 
-                         (1 + self.discount_rate) ** self.battery_params.lifetime_years) / \
-                        ((1 + self.discount_rate) ** self.battery_params.lifetime_years - 1)
-        
-        # Get battery capacity (fixed or variable)
-        battery_capacity = battery_vars['capacity'] if 'capacity' in battery_vars else self.battery_params.capacity
-        
-        # Calculate costs
-        battery_cost = self.battery_params.capex_per_mwh * battery_capacity * annuity_factor
-        solar_cost = self.solar_params.capex_per_mw * self.solar_params.capacity * annuity_factor
-        
-        # Calculate revenue/cost from grid interactions
-        grid_interaction = (grid_vars['export'] * self.grid_params.price_profile).sum()
-        
         # Set objective to minimize net cost
-        model.add_objective(battery_cost + grid_interaction)
-
-    def _extract_results(
-        self,
-        model: linopy.Model,
-        battery_vars: Dict[str, xr.DataArray],
-        solar_vars: Dict[str, xr.DataArray],
-        grid_vars: Dict[str, xr.DataArray]
-    ) -> Dict:
-        """Extract results from the optimization model"""
-        # Debug prints
-        print("\nOptimization Results:")
-        print(f"Battery Capacity: {float(battery_vars['capacity'].solution):.2f} MWh")
-        
-        # Calculate some summary statistics
-        grid_export = grid_vars['export'].solution.values
-        solar_gen = solar_vars['generation'].solution.values
-        battery_charge = battery_vars['charge'].solution.values
-        battery_discharge = battery_vars['discharge'].solution.values
-        
-        print("\nAnnual Summary:")
-        print(f"Total Solar Generation: {solar_gen.sum():.2f} MWh")
-        print(f"Total Battery Charge: {battery_charge.sum():.2f} MWh")
-        print(f"Total Battery Discharge: {battery_discharge.sum():.2f} MWh")
-        print(f"Net Grid Export: {grid_export.sum():.2f} MWh")
-        
-        return {
-            'battery': {
-                'capacity': float(battery_vars['capacity'].solution),
-                'soc': battery_vars['soc'].solution.values,
-                'charge': battery_vars['charge'].solution.values,
-                'discharge': battery_vars['discharge'].solution.values
-            },
-            'solar': {
-                'generation': solar_vars['generation'].solution.values
-            },
-            'grid': {
-                'export': grid_vars['export'].solution.values
-            }
-        }
+        model.add_objective(
+            self._battery_cost_expr(battery_vars) + self._grid_revenue_expr(grid_vars),
+            overwrite=True
+        )
 
     def get_summary(self, results: Dict[str, Any]) -> Dict[str, Any]:
         """Generate a summary of the optimization results"""
@@ -249,4 +269,18 @@ class SolarClippingApplication:
             'total_cost': results.get('total_cost', 0.0),
             'revenue': results.get('revenue', 0.0),
             'net_cost': results.get('net_cost', 0.0)
-        } 
\ No newline at end of file
+        } 
+
+def _run_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Build and solve one application; module-level so worker processes can pickle it"""
+    return SolarClippingApplication(**config).run_optimization()
+
+def run_configs(configs: Iterable[Dict[str, Any]], max_workers: int = None) -> List[Dict[str, Any]]:
+    """Solve independent configurations in parallel worker processes
+
+    Each config holds ``SolarClippingApplication`` keyword arguments; results
+    come back in the same order. Every solve is single-threaded, so separate
+    processes scale with the number of cores (``max_workers`` defaults to all).
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_run_config, configs))
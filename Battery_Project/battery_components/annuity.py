@@ -0,0 +1,7 @@
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def annuity_factor(discount_rate: float, lifetime_years: int) -> float:
+    """Capital recovery factor spreading a CAPEX over its lifetime"""
+    growth = (1 + discount_rate) ** lifetime_years
+    return discount_rate * growth / (growth - 1)
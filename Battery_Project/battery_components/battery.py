@@ -1,12 +1,14 @@
 from dataclasses import dataclass
 from typing import Dict
 import linopy
+import numpy as np
 import pandas as pd
 import xarray as xr
+from .annuity import annuity_factor
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BatteryParameters:
-    """Battery system technical parameters"""
+    """Battery system technical parameters (immutable, so hashable for caching)"""
     capacity: float = None  # MWh, None for optimal sizing
     charge_efficiency: float = 0.95
     discharge_efficiency: float = 0.95
@@ -20,27 +22,40 @@ class BatteryModel:
     """Battery optimization model with constraints"""
     def __init__(self, params: BatteryParameters):
         self.params = params
+        # Scale discharge by a multiply rather than dividing every coefficient
+        self._inv_discharge_efficiency = 1.0 / params.discharge_efficiency
 
     def add_battery_variables(self, model: linopy.Model, time: pd.Index) -> Dict[str, xr.DataArray]:
         """Add battery-related variables to the model"""
+        # With a fixed capacity the C-rate and SOC limits are plain variable bounds
+        # rather than constraint rows
+        if self.params.capacity is not None:
+            power_limit = self.params.c_rate * self.params.capacity
+            soc_limit = self.params.capacity
+        else:
+            power_limit = soc_limit = np.inf
+
         variables = {
             'charge': model.add_variables(
                 name="battery_charge",
                 coords={"time": time},
                 dims=["time"],
-                lower=0
+                lower=0,
+                upper=power_limit
             ),
             'discharge': model.add_variables(
                 name="battery_discharge",
                 coords={"time": time},
                 dims=["time"],
-                lower=0
+                lower=0,
+                upper=power_limit
             ),
             'soc': model.add_variables(
                 name="battery_soc",
                 coords={"time": time},
                 dims=["time"],
-                lower=0
+                lower=0,
+                upper=soc_limit
             )
         }
         
@@ -65,53 +80,45 @@ class BatteryModel:
         self, 
         model: linopy.Model, 
         time: pd.Index, 
-        variables: Dict[str, xr.DataArray]
+        variables: Dict[str, xr.DataArray],
+        step_hours: float = 1.0
     ) -> None:
-        """Add battery-specific constraints to the model"""
-        # Initial SOC balance
-        t0 = time[0]
-        expr0 = variables['soc'].at[t0] - variables['charge'].at[t0] * self.params.charge_efficiency + \
-                variables['discharge'].at[t0] / self.params.discharge_efficiency
-        model.add_constraints(expr0 == 0, name="soc_balance_0")
+        """Add battery-specific constraints to the model
 
-        # SOC balance for remaining timesteps
-        t_later = time[1:]
-        t_prev = time[:-1]  # Previous timesteps
-        soc_expr = variables['soc'].sel(time=t_later)
-        soc_prev = variables['soc'].sel(time=t_prev) * (1 - self.params.standing_loss)
-        charge_t = variables['charge'].sel(time=t_later)
-        discharge_t = variables['discharge'].sel(time=t_later)
+        step_hours: length of one time step; charge/discharge are MW, so the energy
+        moved per step scales with it and standing losses compound over it
+        """
+        # SOC balance for all timesteps in one constraint; shifting leaves the first
+        # step without a previous SOC, so the battery starts empty
+        soc_prev = variables['soc'].shift(time=1).fillna(0) * (1 - self.params.standing_loss) ** step_hours
+        expr = variables['soc'] - soc_prev - variables['charge'] * (self.params.charge_efficiency * step_hours) + \
+               variables['discharge'] * (self._inv_discharge_efficiency * step_hours)
+        model.add_constraints(expr == 0, name="soc_balance")
 
-        expr_later = soc_expr - soc_prev - charge_t * self.params.charge_efficiency + \
-                    discharge_t / self.params.discharge_efficiency
-        model.add_constraints(expr_later == 0, name="soc_balance_rest")
-
-        # Get capacity value (fixed or variable)
-        capacity = variables.get('capacity', self.params.capacity)
+        # A fixed capacity is already enforced through the variable bounds
+        if self.params.capacity is not None:
+            return
 
-        # C-rate constraints
-        model.add_constraints(
-            variables['charge'] <= self.params.c_rate * capacity,
-            name="charge_c_rate_limit"
-        )
-        model.add_constraints(
-            variables['discharge'] <= self.params.c_rate * capacity,
-            name="discharge_c_rate_limit"
-        )
+        capacity = variables['capacity']
 
-        # SOC upper bound
-        model.add_constraints(
-            variables['soc'] <= capacity,
-            name="soc_limit"
-        )
+        # C-rate limits on charge/discharge and the SOC upper bound, stacked along a
+        # 'bound' dimension so they go into the model as a single constraint block
+        power_limit = self.params.c_rate * capacity
+        bounds = linopy.merge(
+            [
+                variables['charge'] - power_limit,
+                variables['discharge'] - power_limit,
+                variables['soc'] - capacity
+            ],
+            dim='bound'
+        ).assign_coords(bound=['charge_c_rate', 'discharge_c_rate', 'soc'])
+        model.add_constraints(bounds <= 0, name="battery_limits")
 
     def calculate_battery_costs(self, variables: Dict[str, xr.DataArray], discount_rate: float) -> float:
         """Calculate battery costs including CAPEX and annuity factor"""
-        annuity_factor = (discount_rate * 
-                         (1 + discount_rate) ** self.params.lifetime_years) / \
-                        ((1 + discount_rate) ** self.params.lifetime_years - 1)
-        
+        annuity = annuity_factor(discount_rate, self.params.lifetime_years)
+
         # Get capacity value (fixed or variable)
         capacity = variables.get('capacity', self.params.capacity)
         
-        return self.params.capex_per_mwh * capacity * annuity_factor 
\ No newline at end of file
+        return self.params.capex_per_mwh * capacity * annuity
\ No newline at end of file
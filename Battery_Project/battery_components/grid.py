@@ -1,15 +1,19 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict
 import linopy
 import pandas as pd
 import xarray as xr
+from .annuity import annuity_factor
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class GridParameters:
-    """Grid connection parameters"""
+    """Grid connection parameters (immutable; sweeps swap in a copy made with
+    dataclasses.replace carrying the new price profile)"""
     max_import: 0  # MW
     max_export: float  # MW
-    price_profile: pd.Series  # Time series of prices in $/MWh
+    # Time series of prices in $/MWh; left out of equality and hashing, which a
+    # Series doesn't support
+    price_profile: pd.Series = field(compare=False, hash=False)
     connection_cost: float  # $/MW
     lifetime_years: int = 20
 
@@ -49,8 +53,10 @@ class GridModel:
 
     def calculate_grid_costs(self, discount_rate: float) -> float:
         """Calculate grid costs including connection cost and annuity factor"""
-        annuity_factor = (discount_rate * 
-                         (1 + discount_rate) ** self.params.lifetime_years) / \
-                        ((1 + discount_rate) ** self.params.lifetime_years - 1)
-        
-        return self.params.connection_cost * max(self.params.max_import, self.params.max_export) * annuity_factor 
\ No newline at end of file
+        annuity = annuity_factor(discount_rate, self.params.lifetime_years)
+
+        # Connection is sized for the larger flow direction
+        max_import, max_export = self.params.max_import, self.params.max_export
+        connection_capacity = max_export if max_export > max_import else max_import
+
+        return self.params.connection_cost * connection_capacity * annuity
\ No newline at end of file
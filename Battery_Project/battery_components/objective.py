@@ -0,0 +1,91 @@
+from typing import Dict
+import logging
+import linopy
+import numpy as np
+import xarray as xr
+
+logger = logging.getLogger(__name__)
+
+class ObjectiveMixin:
+    """Objective terms and result extraction shared by dispatch optimizers
+
+    Hosts provide ``battery_model``, ``grid_model`` and ``_annuity_factor`` (the
+    battery's, see ``annuity.annuity_factor``), and ``_step_hours`` when the
+    horizon isn't hourly.
+    """
+    _step_hours = 1.0
+
+    def _battery_cost_expr(self, battery_vars: Dict[str, xr.DataArray]) -> linopy.LinearExpression:
+        """Annualised battery CAPEX term"""
+        params = self.battery_model.params
+
+        # With a fixed-size battery the CAPEX is a constant that can't move the
+        # optimum, so skip building the expression altogether
+        if params.capacity is not None:
+            return 0
+
+        return params.capex_per_mwh * battery_vars['capacity'] * self._annuity_factor
+
+    def _grid_revenue_expr(self, grid_vars: Dict[str, xr.DataArray]) -> linopy.LinearExpression:
+        """Revenue from grid exports (negative when importing) at the current price profile"""
+        # The price profile is already aligned with the model horizon, so hand linopy
+        # the raw coefficient array instead of letting it align a pandas Series
+        export = grid_vars['export']
+        prices = self.grid_model.params.price_profile.to_numpy()
+        if self._step_hours != 1.0:
+            # Export is MW; each step sells that power for step_hours
+            prices = prices * self._step_hours
+        return export.model.linexpr((prices, export)).sum()
+
+    def _extract_results(
+        self,
+        model: linopy.Model,
+        battery_vars: Dict[str, xr.DataArray],
+        solar_vars: Dict[str, xr.DataArray],
+        grid_vars: Dict[str, xr.DataArray]
+    ) -> Dict:
+        """Extract results from the optimization model"""
+        battery_capacity = battery_vars['capacity'].solution.item()
+        grid_export = grid_vars['export'].solution.values
+        solar_gen = solar_vars['generation'].solution.values
+        battery_charge = battery_vars['charge'].solution.values
+        battery_discharge = battery_vars['discharge'].solution.values
+
+        # Summary statistics are only reduced when someone is listening, so sweeps
+        # don't pay for the sums or for flushing stdout
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Battery Capacity: %.2f MWh", battery_capacity)
+            logger.debug("Total Solar Generation: %.2f MWh", solar_gen.sum())
+            logger.debug("Total Battery Charge: %.2f MWh", battery_charge.sum())
+            logger.debug("Total Battery Discharge: %.2f MWh", battery_discharge.sum())
+            logger.debug("Net Grid Export: %.2f MWh", grid_export.sum())
+
+        # Single fused multiply-accumulate, no temporary export*price array
+        revenue = float(np.dot(grid_export, self.grid_model.params.price_profile.to_numpy())) * self._step_hours
+
+        # Cycling summary: total discharge and equivalent full cycles
+        throughput = float(battery_discharge.sum()) * self._step_hours
+        cycles = throughput / battery_capacity if battery_capacity > 0 else 0.0
+
+        # Hourly series are handed back as contiguous float32; solver precision
+        # doesn't warrant float64 and it halves the memory kept per run
+        def as_float32(values: np.ndarray) -> np.ndarray:
+            return np.ascontiguousarray(values, dtype=np.float32)
+        
+        return {
+            'battery': {
+                'capacity': battery_capacity,
+                'soc': as_float32(battery_vars['soc'].solution.values),
+                'charge': as_float32(battery_charge),
+                'discharge': as_float32(battery_discharge),
+                'throughput': throughput,  # MWh discharged
+                'equivalent_full_cycles': cycles
+            },
+            'solar': {
+                'generation': as_float32(solar_gen)
+            },
+            'grid': {
+                'export': as_float32(grid_export)
+            },
+            'revenue': revenue
+        } 
\ No newline at end of file
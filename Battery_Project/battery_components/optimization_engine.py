@@ -1,37 +1,88 @@
 from typing import Dict, Any
+from dataclasses import replace
+import hashlib
+import os
+import tempfile
 import linopy
 import pandas as pd
 import xarray as xr
 from .battery import BatteryParameters, BatteryModel
 from .grid import GridParameters, GridModel
 from .solar import SolarParameters, SolarModel
+from .annuity import annuity_factor
+from .objective import ObjectiveMixin
+from .warm_start import WarmStartMixin
 
-class OptimizationEngine:
+class OptimizationEngine(ObjectiveMixin, WarmStartMixin):
     """Main optimization engine that coordinates all components"""
     def __init__(
         self,
         battery_params: BatteryParameters,
         solar_params: SolarParameters,
         grid_params: GridParameters,
-        discount_rate: float = 0.08
+        discount_rate: float = 0.08,
+        model_cache_dir: str = None,  # persist built LPs here to skip rebuilds across processes
+        solver_name: str = 'highs',  # any solver linopy supports; HiGHS is solved in memory
+        time_resolution: str = 'h',  # pandas frequency, e.g. '4h' or 'D' to shrink sizing LPs
+        solver_options: Dict[str, Any] = None  # extra solver settings, see WarmStartMixin
     ):
         self.battery_model = BatteryModel(battery_params)
         self.solar_model = SolarModel(solar_params)
         self.grid_model = GridModel(grid_params)
         self.discount_rate = discount_rate
+        self._annuity_factor = annuity_factor(discount_rate, battery_params.lifetime_years)
+        self.model_cache_dir = model_cache_dir
+        self.solver_name = solver_name
+        self.solver_options = dict(solver_options or {})
+        self.time_resolution = time_resolution
 
-    def optimize(self) -> Dict[str, Any]:
-        """Run the optimization and return results"""
-        # Create time index using the same timezone as the price profile
-        time = pd.date_range(
-            start=self.grid_model.params.price_profile.index[0],
-            end=self.grid_model.params.price_profile.index[-1],
-            freq='h'
-        )
-        
-        # Ensure all time series data is aligned
-        self.solar_model.generation_profile = self.solar_model.generation_profile.reindex(time, fill_value=0)
-        self.grid_model.params.price_profile = self.grid_model.params.price_profile.reindex(time, fill_value=0)
+        # Coarser steps average the hourly profiles over each block; the battery and
+        # objective scale their energy terms by the step length accordingly
+        price_profile = grid_params.price_profile
+        if time_resolution != 'h':
+            self.solar_model.generation_profile = self.solar_model.generation_profile.resample(time_resolution).mean()
+            price_profile = price_profile.resample(time_resolution).mean()
+
+        # Create time index using the same timezone as the price profile and align
+        # all time series to it once, up front; a price index already at the target
+        # resolution is the horizon, other indexes are resampled
+        price_index = price_profile.index
+        if price_index.freq == time_resolution:
+            self._time = price_index
+        else:
+            self._time = pd.date_range(start=price_index[0], end=price_index[-1], freq=time_resolution)
+        step = pd.date_range(start=self._time[0], periods=2, freq=time_resolution)
+        self._step_hours = (step[1] - step[0]) / pd.Timedelta(hours=1)
+        self.solar_model.align_to(self._time)
+        if not price_profile.index.equals(self._time):
+            price_profile = price_profile.reindex(self._time, fill_value=0)
+
+        # Grid parameters are frozen, and the caller's are left as they are; the
+        # engine keeps a copy carrying the aligned profile
+        if price_profile is not grid_params.price_profile:
+            self.grid_model.params = replace(grid_params, price_profile=price_profile)
+
+        # LP structure is built once and reused across optimize() calls
+        self._model = None
+        self._battery_vars = None
+        self._solar_vars = None
+        self._grid_vars = None
+
+    def _build_base_model(self) -> None:
+        """Build variables and constraints once and cache them on the engine"""
+        cache_path = self._model_cache_path() if self.model_cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            try:
+                self._load_base_model(cache_path)
+                return
+            except Exception as e:
+                # An unreadable file is a cache miss; it is rebuilt and replaced below
+                print(f"Warning: Failed to load cached model {cache_path}: {str(e)}")
+
+        # Own copy of the horizon named after the model dimension: the profiles
+        # share self._time, and callers (e.g. chart helpers) may rename their
+        # index in place
+        time = self._time.rename('time')
 
         # Initialize optimization model
         model = linopy.Model()
@@ -42,7 +93,7 @@ class OptimizationEngine:
         grid_vars = self.grid_model.add_grid_variables(model, time)
 
         # Add constraints from each component
-        self.battery_model.add_battery_constraints(model, time, battery_vars)
+        self.battery_model.add_battery_constraints(model, time, battery_vars, self._step_hours)
         self.solar_model.add_solar_constraints(
             model, time, solar_vars,
             self.battery_model.params.has_dedicated_inverter,
@@ -55,11 +106,82 @@ class OptimizationEngine:
             battery_vars['discharge']
         )
 
+        self._model = model
+        self._battery_vars = battery_vars
+        self._solar_vars = solar_vars
+        self._grid_vars = grid_vars
+
+        # Persist the structure (no objective yet) for other processes in a sweep
+        # Written next to the target and moved into place, so other processes
+        # never see a partial file, even when several build the same key
+        if cache_path:
+            os.makedirs(self.model_cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(suffix='.nc.tmp', dir=self.model_cache_dir)
+            os.close(fd)
+            try:
+                model.to_netcdf(tmp_path)
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+
+    def _model_cache_path(self) -> str:
+        """Cache file for the LP structure, keyed by every input that shapes it"""
+        # Prices and discount rate only enter the objective and are left out of the key
+        key = hashlib.sha256()
+        key.update(repr((
+            self.battery_model.params,
+            self.solar_model.params.capacity,
+            self.grid_model.params.max_import,
+            self.grid_model.params.max_export
+        )).encode())
+        key.update(self._time.values.tobytes())
+        key.update(self.solar_model.generation_profile.to_numpy().tobytes())
+        return os.path.join(self.model_cache_dir, f'{key.hexdigest()[:16]}.nc')
+
+    def _load_base_model(self, path: str) -> None:
+        """Restore a cached LP structure and its variable handles"""
+        model = linopy.read_netcdf(path)
+
+        # Variable names as assigned by the component models
+        self._model = model
+        self._battery_vars = {
+            name: model.variables[f'battery_{name}']
+            for name in ('charge', 'discharge', 'soc', 'capacity')
+        }
+        self._solar_vars = {'generation': model.variables['solar_generation']}
+        self._grid_vars = {'export': model.variables['grid_export']}
+
+    def invalidate_model(self) -> None:
+        """Discard the cached LP so the next optimize() rebuilds it"""
+        # Needed after changing anything structural (battery/solar parameters,
+        # generation profile or horizon); price changes only touch the objective
+        self._model = None
+        self._invalidate_basis()
+
+    def optimize(self, warm_start_from: 'OptimizationEngine' = None) -> Dict[str, Any]:
+        """Run the optimization and return results
+
+        warm_start_from: engine whose last optimal basis seeds HiGHS (default: this one)
+        """
+        if self._model is None:
+            self._build_base_model()
+        model = self._model
+        battery_vars = self._battery_vars
+        solar_vars = self._solar_vars
+        grid_vars = self._grid_vars
+
+        # Prices only enter the objective, so a sweep just re-sets it; profiles were
+        # aligned in __init__ and replacements must keep the same index
+        if not self.grid_model.params.price_profile.index.equals(self._time):
+            raise ValueError("Price profile is not aligned with the optimization horizon")
+
         # Set objective
         self._set_objective(model, battery_vars, solar_vars, grid_vars)
 
-        # Solve the model
-        model.solve()
+        # Solve the model, warm-starting from the previous basis when the LP
+        # structure is unchanged
+        self._solve_warm(model, warm_start_from)
         
         # Check if solution exists
         # if not model.solution.is_feasible:
@@ -76,61 +198,9 @@ class OptimizationEngine:
         grid_vars: Dict[str, xr.DataArray]
     ) -> None:
         """Set the optimization objective"""
-        # Calculate annuity factor
-        annuity_factor = (self.discount_rate * 
-                         (1 + self.discount_rate) ** self.battery_model.params.lifetime_years) / \
-                        ((1 + self.discount_rate) ** self.battery_model.params.lifetime_years - 1)
-        
-        # Get battery capacity (fixed or variable)
-        battery_capacity = battery_vars['capacity'] #if 'capacity' in battery_vars else self.battery_model.params.capacity
-        
-        # Calculate costs
-        battery_cost = self.battery_model.params.capex_per_mwh * battery_capacity * annuity_factor
-        
-        # Calculate revenue/cost from grid interactions
         # Positive export means selling to grid, negative means buying from grid
-        grid_interaction = (grid_vars['export'] * self.grid_model.params.price_profile).sum()
-        
         # Set objective to minimize net cost
-        model.add_objective(battery_cost - grid_interaction)
-
-    def _extract_results(
-        self,
-        model: linopy.Model,
-        battery_vars: Dict[str, xr.DataArray],
-        solar_vars: Dict[str, xr.DataArray],
-        grid_vars: Dict[str, xr.DataArray]
-    ) -> Dict:
-        """Extract results from the optimization model"""
-        # Debug prints
-        print("\nOptimization Results:")
-        print(f"Battery Capacity: {float(battery_vars['capacity'].solution):.2f} MWh")
-
-        
-        # Calculate some summary statistics
-        grid_export = grid_vars['export'].solution.values
-        solar_gen = solar_vars['generation'].solution.values
-        battery_charge = battery_vars['charge'].solution.values
-        battery_discharge = battery_vars['discharge'].solution.values
-        
-        print("\nAnnual Summary:")
-        print(f"Total Solar Generation: {solar_gen.sum():.2f} MWh")
-        print(f"Total Battery Charge: {battery_charge.sum():.2f} MWh")
-        print(f"Total Battery Discharge: {battery_discharge.sum():.2f} MWh")
-        print(f"Net Grid Export: {grid_export.sum():.2f} MWh")
-        
-        return {
-            'battery': {
-                'capacity': float(battery_vars['capacity'].solution),
-
-                'soc': battery_vars['soc'].solution.values,
-                'charge': battery_vars['charge'].solution.values,
-                'discharge': battery_vars['discharge'].solution.values
-            },
-            'solar': {
-                'generation': solar_vars['generation'].solution.values
-            },
-            'grid': {
-                'export': grid_vars['export'].solution.values
-            }
-        } 
\ No newline at end of file
+        model.add_objective(
+            self._battery_cost_expr(battery_vars) - self._grid_revenue_expr(grid_vars),
+            overwrite=True
+        )
@@ -1,16 +1,30 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
-import json
-from io import StringIO
-from typing import Optional
+from typing import Tuple
 
 class RenewablesNinjaAPI:
     """Handler for Renewables.ninja API"""
-    def __init__(self, api_token: str):
+    def __init__(self, api_token: str, timeout: Tuple[float, float] = (5.0, 30.0)):
         self.token = api_token
         self.api_base = 'https://www.renewables.ninja/api/'
+        self.timeout = timeout  # (connect, read) seconds
         self.session = requests.Session()
-        self.session.headers = {'Authorization': f'Token {self.token}'}
+        # Clients are shared across threads (see solar.prefetch_generation_profiles),
+        # so keep enough pooled connections for concurrent fetches. Transient server
+        # errors are retried with backoff; rate limiting (429) is not, since its
+        # Retry-After would stall the caller. An unreachable host fails fast and a
+        # read timeout isn't retried, so a hung endpoint costs one read timeout
+        # before the default profile takes over
+        retries = Retry(total=3, connect=1, read=0, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504))
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries))
+        # Update rather than replace the headers so the session keeps requesting
+        # gzip-compressed responses
+        self.session.headers.update({
+            'Authorization': f'Token {self.token}',
+            'Accept-Encoding': 'gzip'
+        })
 
     def fetch_pv_data(
         self,
@@ -41,12 +55,19 @@ class RenewablesNinjaAPI:
             'local_time': 'true'
         }
         
-        response = self.session.get(url, params=params)
+        response = self.session.get(url, params=params, timeout=self.timeout)
         if response.status_code == 200:
             data = response.json()
-            # Convert to DataFrame
-            df = pd.read_json(StringIO(json.dumps(data['data'])), orient='index')
-            df.index = pd.to_datetime(df.index)
+            # Convert to DataFrame straight from the parsed records, without
+            # serialising them back to JSON text and parsing again
+            df = pd.DataFrame.from_dict(data['data'], orient='index')
+            # Records are keyed by epoch milliseconds (read_json used to detect this)
+            if df.index.str.isdigit().all():
+                df.index = pd.to_datetime(df.index.astype('int64'), unit='ms')
+            else:
+                # ISO 8601 stamps; pandas 2 infers the format from the first one and
+                # applies it to all, and format='ISO8601' would break pandas 1.5
+                df.index = pd.to_datetime(df.index, cache=True)
             return df['electricity']  # Return the electricity generation column
         else:
-            raise Exception(f"API Error: {response.status_code} - {response.text}") 
\ No newline at end of file
+            raise Exception(f"API Error: {response.status_code} - {response.text}")
\ No newline at end of file
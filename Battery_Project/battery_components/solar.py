@@ -1,15 +1,104 @@
-from dataclasses import dataclass
-from typing import Dict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import linopy
 import pandas as pd
 import xarray as xr
 import numpy as np
 from datetime import datetime, timedelta
+from functools import lru_cache
 from .renewables_ninja import RenewablesNinjaAPI
+from .annuity import annuity_factor
 
-@dataclass
+@lru_cache(maxsize=8)
+def _ninja_api(api_token: str) -> RenewablesNinjaAPI:
+    """Shared Renewables.ninja client per token, so fetches reuse HTTPS connections"""
+    return RenewablesNinjaAPI(api_token)
+
+@lru_cache(maxsize=32)
+def _fetch_generation_profile(
+    api_token: str,
+    latitude: float,
+    longitude: float,
+    start_date: str,
+    end_date: str,
+    capacity: float,
+    system_loss: float,
+    tracking: int,
+    tilt: float,
+    azimuth: float
+) -> pd.Series:
+    """Fetch a Renewables.ninja PV profile, memoised per site and date range"""
+    return _ninja_api(api_token).fetch_pv_data(
+        lat=latitude,
+        lon=longitude,
+        date_from=start_date,
+        date_to=end_date,
+        capacity=capacity,
+        system_loss=system_loss,
+        tracking=tracking,
+        tilt=tilt,
+        azim=azimuth
+    ).astype(np.float32)
+
+@lru_cache(maxsize=32)
+def _default_generation_profile(start_date: str, capacity: float, hours_per_year: int = 8760) -> pd.Series:
+    """Build the fallback generation profile, memoised per start date and capacity"""
+    time_index = pd.date_range(start_date, periods=hours_per_year, freq='h')
+    # Smooth diurnal half-sine peaking at noon and zero overnight; unlike random
+    # noise it gives the solver a regular, half-sparse bound to presolve
+    hour = time_index.hour.to_numpy()
+    shape = np.maximum(0, np.sin((hour - 6) * np.pi / 12)).astype(np.float32)
+    return pd.Series(shape * np.float32(capacity), index=time_index)
+
+def _resolve_dates(params: 'SolarParameters') -> Tuple[str, str]:
+    """Start and end date, defaulting to the year up to today"""
+    today = datetime.now()
+    start_date = params.start_date or (today - timedelta(days=365)).strftime('%Y-%m-%d')
+    end_date = params.end_date or today.strftime('%Y-%m-%d')
+    return start_date, end_date
+
+def _fetch_args(params: 'SolarParameters', start_date: str, end_date: str) -> tuple:
+    """Arguments for ``_fetch_generation_profile``, i.e. its cache key"""
+    return (
+        params.api_token,
+        params.latitude,
+        params.longitude,
+        start_date,
+        end_date,
+        params.capacity,
+        params.system_loss,
+        params.tracking,
+        params.tilt,
+        params.azimuth
+    )
+
+def prefetch_generation_profiles(params_list: Iterable['SolarParameters'], max_workers: int = 4) -> None:
+    """Download the Renewables.ninja profiles of several scenarios concurrently
+
+    Profiles land in the module cache, so SolarModels built afterwards (e.g. by the
+    applications of a sweep) don't block on one download after another.
+    """
+    # Duplicate sites are fetched once; explicit profiles need no fetch at all
+    fetches = {
+        _fetch_args(params, *_resolve_dates(params))
+        for params in params_list
+        if params.api_token and params.generation_profile is None
+    }
+
+    def fetch(args: tuple) -> None:
+        try:
+            _fetch_generation_profile(*args)
+        except Exception as e:
+            # Failures aren't cached; SolarModel retries and falls back to the default profile
+            print(f"Warning: Failed to prefetch solar data from Renewables.ninja: {str(e)}")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        list(pool.map(fetch, fetches))
+
+@dataclass(frozen=True, slots=True)
 class SolarParameters:
-    """Solar installation parameters"""
+    """Solar installation parameters (immutable once created)"""
     latitude: float
     longitude: float
     capacity: float  # MW
@@ -24,68 +113,91 @@ class SolarParameters:
     end_date: str = None  # format: 'YYYY-MM-DD'
     capex_per_mw: float = 1000000  # $/MW
     lifetime_years: int = 25  # years
+    # MW, skips the API/default profile if given; left out of equality and hashing,
+    # which a Series doesn't support
+    generation_profile: Optional[pd.Series] = field(default=None, compare=False, hash=False)
 
     def __post_init__(self):
         """Set default values after initialization"""
         if self.inverter_capacity is None:
-            self.inverter_capacity = self.capacity
+            # Frozen dataclass, so bypass the generated __setattr__
+            object.__setattr__(self, 'inverter_capacity', self.capacity)
 
 class SolarModel:
     """Solar optimization model with constraints"""
     def __init__(self, params: SolarParameters):
         self.params = params
-        self.ninja_api = None
-        if params.api_token:
-            self.ninja_api = RenewablesNinjaAPI(params.api_token)
         
         # Set default dates if not provided
-        today = datetime.now()
-        self.start_date = params.start_date or (today - timedelta(days=365)).strftime('%Y-%m-%d')
-        self.end_date = params.end_date or today.strftime('%Y-%m-%d')
+        self.start_date, self.end_date = _resolve_dates(params)
         
         # Initialize generation profile
         self.generation_profile = self._get_generation_profile()
 
     def _get_generation_profile(self) -> pd.Series:
         """Get solar generation profile from Renewables.ninja API or use default profile"""
-        if self.ninja_api:
+        # A caller-supplied profile takes precedence; no need to fetch anything
+        if self.params.generation_profile is not None:
+            return self.params.generation_profile
+
+        # Profiles are cached at module level so repeated runs and parameter sweeps
+        # reuse the same hourly series; hand out a copy so callers can't mutate the cache.
+        # They are stored as float32, which is ample for LP bounds
+        if self.params.api_token:
             try:
-                return self.ninja_api.fetch_pv_data(
-                    lat=self.params.latitude,
-                    lon=self.params.longitude,
-                    date_from=self.start_date,
-                    date_to=self.end_date,
-                    capacity=self.params.capacity,
-                    system_loss=self.params.system_loss,
-                    tracking=self.params.tracking,
-                    tilt=self.params.tilt,
-                    azim=self.params.azimuth
-                )
+                return _fetch_generation_profile(
+                    *_fetch_args(self.params, self.start_date, self.end_date)
+                ).copy()
             except Exception as e:
                 print(f"Warning: Failed to fetch solar data from Renewables.ninja: {str(e)}")
                 print("Using default generation profile instead")
         
         # Default profile if API fails or not configured
-        hours_per_year = 8760
-        time_index = pd.date_range(self.start_date, periods=hours_per_year, freq='h')
-        return pd.Series(
-            np.random.uniform(0, 1, hours_per_year),
-            index=time_index
+        return _default_generation_profile(self.start_date, self.params.capacity).copy()
+
+    def align_to(self, time: pd.DatetimeIndex) -> None:
+        """Align the generation profile to the optimization time index"""
+        if self.generation_profile.index.equals(time):
+            return
+
+        # Interpolate on int64 timestamps instead of zero-filling missing hours, which
+        # would fabricate no-generation periods and bias statistics like the mean
+        def to_ns(index: pd.DatetimeIndex) -> np.ndarray:
+            return index.values.astype('datetime64[ns]').view(np.int64)
+
+        values = np.interp(
+            to_ns(time),
+            to_ns(self.generation_profile.index),
+            self.generation_profile.to_numpy(),
+            left=0.0,
+            right=0.0
         )
+        self.generation_profile = pd.Series(values.astype(np.float32), index=time)
 
     def add_solar_variables(self, model: linopy.Model, time: pd.Index) -> Dict[str, xr.DataArray]:
         """Add solar-related variables to the model"""
+        # Available generation and nameplate capacity are both plain bounds on the
+        # variable, so neither costs a constraint row
         variables = {
             'generation': model.add_variables(
                 name="solar_generation",
                 coords={"time": time},
                 dims=["time"],
                 lower=0,
-                upper=self.params.capacity
+                upper=pd.Series(self._generation_upper(), index=time)
             )
         }
         return variables
 
+    def _generation_upper(self) -> np.ndarray:
+        """Hourly generation bound: the profile, capped at nameplate capacity"""
+        return np.minimum(self.generation_profile.to_numpy(), self.params.capacity)
+
+    def update_generation_bounds(self, variables: Dict[str, xr.DataArray]) -> None:
+        """Re-apply the current generation profile to an already built model"""
+        generation = variables['generation']
+        generation.update(upper=generation.upper.copy(data=self._generation_upper()))
+
     def add_solar_constraints(
         self,
         model: linopy.Model,
@@ -95,11 +207,8 @@ class SolarModel:
         battery_capacity: float
     ) -> None:
         """Add solar-specific constraints to the model"""
-        # Generation profile constraint
-        model.add_constraints(
-            variables['generation'] <= self.generation_profile,
-            name='solar_generation_profile'
-        )
+        # The generation profile is enforced through the variable's upper bound
+        # (see add_solar_variables), so there is no profile constraint
 
 
         # model.add_constraints(
@@ -109,8 +218,6 @@ class SolarModel:
 
     def calculate_solar_costs(self, discount_rate: float) -> float:
         """Calculate solar costs including CAPEX and annuity factor"""
-        annuity_factor = (discount_rate * 
-                         (1 + discount_rate) ** self.params.lifetime_years) / \
-                        ((1 + discount_rate) ** self.params.lifetime_years - 1)
-        
-        return self.params.capex_per_mw * self.params.capacity * annuity_factor 
\ No newline at end of file
+        annuity = annuity_factor(discount_rate, self.params.lifetime_years)
+
+        return self.params.capex_per_mw * self.params.capacity * annuity
\ No newline at end of file
@@ -0,0 +1,55 @@
+import os
+import tempfile
+from types import MappingProxyType
+import linopy
+
+class WarmStartMixin:
+    """Carries the optimal solver basis from one solve to the next
+
+    Hosts provide ``battery_model`` and ``_time``, and may override ``solver_name``
+    and ``solver_options`` (extra solver settings, e.g. ``{'parallel': 'on',
+    'threads': 8}`` for HiGHS on a many-core machine). Options are per instance:
+    hosts assign their own dict, the shared default is read-only.
+    """
+    solver_name = 'highs'
+    solver_options = MappingProxyType({})
+    _basis_dir = None
+    _basis_key = None
+
+    def _topology_key(self) -> tuple:
+        """Identifies LP layouts whose bases are interchangeable"""
+        # Everything else (prices, c-rate, clip threshold, ...) only changes
+        # coefficients, which a stored basis survives
+        return (self.solver_name, len(self._time), self.battery_model.params.capacity is None)
+
+    def _solve_warm(self, model: linopy.Model, warm_start_from: 'WarmStartMixin' = None) -> None:
+        """Solve, starting from the last basis of ``warm_start_from`` (default: self)"""
+        if self._basis_dir is None:
+            self._basis_dir = tempfile.TemporaryDirectory()
+        basis_fn = os.path.join(self._basis_dir.name, 'last.bas')
+
+        source = warm_start_from if warm_start_from is not None else self
+        key = self._topology_key()
+        warmstart_fn = None
+        if source._basis_key == key:
+            warmstart_fn = os.path.join(source._basis_dir.name, 'last.bas')
+
+        # HiGHS is handed the model in memory rather than through an LP file, and
+        # pinned to simplex since interior point would ignore the basis
+        options = {}
+        if self.solver_name == 'highs':
+            options = {'io_api': 'direct', 'solver': 'simplex'}
+        options.update(self.solver_options)
+
+        # The new optimal basis is written back for the next call
+        model.solve(
+            solver_name=self.solver_name,
+            basis_fn=basis_fn,
+            warmstart_fn=warmstart_fn,
+            **options
+        )
+        self._basis_key = key
+
+    def _invalidate_basis(self) -> None:
+        """Forget the stored basis so the next solve starts cold"""
+        self._basis_key = None
@@ -1,10 +1,11 @@
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List
 import pandas as pd
 import numpy as np
 import linopy
 import xarray as xr
-from datetime import datetime, timedelta
+from battery_components.annuity import annuity_factor
+from battery_components.warm_start import WarmStartMixin
 
 # Component Layer Classes
 @dataclass
@@ -52,6 +53,12 @@ class BatteryApplication:
         self.grid = grid
         self.discount_rate = discount_rate
 
+        # Annuity factor over the battery lifetime, shared by every cost term
+        self._annuity = annuity_factor(discount_rate, battery.lifetime_years)
+
+        # Price profiles by horizon length and grid tariff, built on first use
+        self._price_profiles: Dict[tuple, np.ndarray] = {}
+
     def add_component_constraints(self, model: linopy.Model, time: pd.Index) -> None:
         """Add component-level constraints"""
         raise NotImplementedError
@@ -64,6 +71,10 @@ class BatteryApplication:
         """Set optimization objective"""
         raise NotImplementedError
 
+    def fixed_costs(self) -> float:
+        """Cost terms that don't depend on the dispatch, left out of the objective"""
+        return 0.0
+
 class PeakShavingApplication(BatteryApplication):
     """Battery application for peak shaving"""
     def add_component_constraints(self, model: linopy.Model, time: pd.Index) -> None:
@@ -72,29 +83,24 @@ class PeakShavingApplication(BatteryApplication):
         discharge = model.add_variables(name="discharge", coords={"time": time}, lower=0)
         soc = model.add_variables(name="soc", coords={"time": time}, lower=0)
 
-        # Battery SOC balance
-        t0 = time[0]
-        expr0 = soc.at[t0] - charge.at[t0] * self.battery.charge_efficiency + \
-                discharge.at[t0] / self.battery.discharge_efficiency
-        model.add_constraints(expr0 == 0, name="soc_balance_0")
+        # Battery SOC balance over the whole horizon; the shifted term is empty
+        # at t0, which leaves the battery starting from zero charge
+        soc_prev = soc.shift(time=1).fillna(0) * (1 - self.battery.standing_loss)
+        expr = soc - soc_prev - charge * self.battery.charge_efficiency + \
+               discharge / self.battery.discharge_efficiency
+        model.add_constraints(expr == 0, name="soc_balance")
 
-        # SOC balance for remaining timesteps
-        t_later = time[1:]
-        soc_expr = soc.sel(time=t_later)
-        soc_prev = soc.sel(time=t_later - 1) * (1 - self.battery.standing_loss)
-        charge_t = charge.sel(time=t_later)
-        discharge_t = discharge.sel(time=t_later)
-
-        expr_later = soc_expr - soc_prev - charge_t * self.battery.charge_efficiency + \
-                    discharge_t / self.battery.discharge_efficiency
-        model.add_constraints(expr_later == 0, name="soc_balance_rest")
-
-        # Add renewable constraints
+        # Add renewable constraints; with a dedicated inverter its limit is a
+        # plain bound on generation, so it is folded into the variable bound
+        # instead of adding a constraint row per timestep
+        generation_upper = np.asarray(self.renewable.generation_profile, dtype=float)
+        if self.battery.has_dedicated_inverter:
+            generation_upper = np.minimum(generation_upper, self.renewable.inverter_capacity)
         generation = model.add_variables(
             name="generation",
             coords={"time": time},
             lower=0,
-            upper=self.renewable.generation_profile
+            upper=xr.DataArray(generation_upper, coords={"time": time})
         )
 
         # Add inverter constraints
@@ -103,10 +109,6 @@ class PeakShavingApplication(BatteryApplication):
                 charge + discharge <= self.battery.c_rate * self.battery.capacity,
                 name="battery_inverter_limit"
             )
-            model.add_constraints(
-                generation <= self.renewable.inverter_capacity,
-                name="generation_inverter_limit"
-            )
         else:
             model.add_constraints(
                 charge + discharge + generation <= self.battery.c_rate * self.battery.capacity,
@@ -121,61 +123,102 @@ class PeakShavingApplication(BatteryApplication):
             upper=self.grid.max_export_capacity
         )
 
-        # Export definition
+        # Export definition, assembled from (coefficient, variable) pairs in one go
         model.add_constraints(
-            export == generation - charge + discharge,
+            model.linexpr((1, export), (-1, generation), (1, charge), (-1, discharge)) == 0,
             name="export_definition"
         )
 
     def add_application_constraints(self, model: linopy.Model, time: pd.Index) -> None:
         # Peak shaving specific constraints
         price_profile = self._create_price_profile(len(time))
-        peak_mask = price_profile == self.grid.electricity_price_peak
+        peak_idx = np.flatnonzero(price_profile == self.grid.electricity_price_peak)
         
-        # Ensure battery discharges during peak hours
+        # Ensure battery discharges during peak hours; positional selection
+        # skips the label lookup of the peak timestamps
         discharge = model.variables["discharge"]
         model.add_constraints(
-            discharge.sel(time=time[peak_mask]) >= 0.1 * self.battery.capacity,
+            discharge.isel(time=peak_idx) >= 0.1 * self.battery.capacity,
             name="peak_shaving_constraint"
         )
 
     def set_objective(self, model: linopy.Model) -> None:
-        # Calculate annuity factor
-        annuity_factor = (self.discount_rate * 
-                         (1 + self.discount_rate) ** self.battery.lifetime_years) / \
-                        ((1 + self.discount_rate) ** self.battery.lifetime_years - 1)
-        
-        # Calculate costs
-        battery_cost = self.battery.capex_per_mwh * self.battery.capacity * annuity_factor
-        renewable_cost = self.renewable.capex_per_mw * self.renewable.capacity * annuity_factor
-        
-        # Calculate revenue
-        price_profile = self._create_price_profile(len(model.variables["export"].coords["time"]))
-        revenue = (price_profile * model.variables["export"]).sum()
+        # Capacities are fixed, so the CAPEX terms are constants that can't move
+        # the optimum (and linopy rejects them in an objective); they are added
+        # back when results are reported, see fixed_costs()
+
+        # Calculate revenue; the price is labelled with the export's own time
+        # coordinate, so linopy takes it as-is instead of inferring its dims
+        export = model.variables["export"]
+        time = export.indexes["time"]
+        price_profile = xr.DataArray(self._create_price_profile(len(time)), coords={"time": time})
+        revenue = model.linexpr((price_profile, export)).sum()
         
         # Set objective to minimize net cost
-        model.add_objective(battery_cost + renewable_cost - revenue)
+        model.add_objective(-revenue)
+
+    def fixed_costs(self) -> float:
+        """Annualised battery and renewable CAPEX"""
+        battery_cost = self.battery.capex_per_mwh * self.battery.capacity * self._annuity
+        renewable_cost = self.renewable.capex_per_mw * self.renewable.capacity * self._annuity
+        return battery_cost + renewable_cost
 
     def _create_price_profile(self, hours: int) -> np.ndarray:
-        """Create price profile based on peak/off-peak hours"""
-        hour_of_day = np.tile(np.arange(24), hours // 24)
-        price_array = np.full(hours, self.grid.electricity_price_offpeak)
-        
+        """Create price profile based on peak/off-peak hours
+
+        The profile is built once per horizon length and tariff and returned
+        read-only, since the constraints and the objective both ask for it.
+        """
+        # The tariff is part of the key, so changing prices or peak hours on the
+        # grid component between solves builds a new profile
+        key = (
+            hours,
+            self.grid.electricity_price_peak,
+            self.grid.electricity_price_offpeak,
+            tuple(sorted((name, tuple(period)) for name, period in self.grid.peak_hours.items()))
+        )
+        cached = self._price_profiles.get(key)
+        if cached is not None:
+            return cached
+
+        # Peak periods are resolved on a single day, which is then repeated
+        # over the horizon (a trailing partial day is cut short)
+        day_prices = np.full(24, self.grid.electricity_price_offpeak)
         for peak_period in self.grid.peak_hours.values():
-            peak_mask = (hour_of_day >= peak_period[0]) & (hour_of_day < peak_period[1])
-            price_array[peak_mask] = self.grid.electricity_price_peak
-            
+            day_prices[peak_period[0]:peak_period[1]] = self.grid.electricity_price_peak
+
+        price_array = np.resize(day_prices, hours)
+        price_array.flags.writeable = False
+
+        self._price_profiles[key] = price_array
         return price_array
 
-class OptimizationEngine:
+class OptimizationEngine(WarmStartMixin):
     """Main optimization engine"""
-    def __init__(self, application: BatteryApplication):
+    def __init__(self, application: BatteryApplication, solver_options: Dict = None):
         self.application = application
+        self.solver_options = dict(solver_options or {})  # extra solver settings, see WarmStartMixin
+
+    def _topology_key(self) -> tuple:
+        """Identifies LP layouts whose bases are interchangeable"""
+        # Capacity is fixed here, so the layout follows the horizon, the inverter
+        # setup and which hours carry a peak-shaving row
+        app = self.application
+        return (
+            self.solver_name,
+            len(self._time),
+            app.battery.has_dedicated_inverter,
+            tuple(tuple(period) for period in app.grid.peak_hours.values())
+        )
 
-    def optimize(self) -> Dict:
-        """Run the optimization"""
+    def optimize(self, warm_start_from: 'OptimizationEngine' = None) -> Dict:
+        """Run the optimization
+
+        warm_start_from: engine whose last optimal basis seeds HiGHS (default: this one)
+        """
         # Create time index
-        time = pd.Index(range(len(self.application.renewable.generation_profile)), name="time")
+        time = pd.RangeIndex(len(self.application.renewable.generation_profile), name="time")
+        self._time = time
         
         # Initialize model
         model = linopy.Model()
@@ -187,8 +230,9 @@ class OptimizationEngine:
         # Set objective
         self.application.set_objective(model)
         
-        # Solve
-        model.solve(solver_name='highs')
+        # Solve, warm-starting from the previous basis when the LP structure is
+        # unchanged (e.g. a sweep over prices, costs or efficiencies)
+        self._solve_warm(model, warm_start_from)
         
         # Extract results
         results = self._extract_results(model)
@@ -196,11 +240,14 @@ class OptimizationEngine:
         return results
 
     def _extract_results(self, model: linopy.Model) -> Dict:
-        """Extract and format optimization results"""
-        results = {}
-        for var_name, var in model.variables.items():
-            results[var_name] = var.solution.values
-            
+        """Extract and format optimization results
+
+        Solutions are returned as time-labelled DataArrays; use ``.values`` where
+        a bare ndarray is needed. ``net_cost`` adds the fixed costs back to the
+        solved objective.
+        """
+        results = {var_name: var.solution for var_name, var in model.variables.items()}
+        results['net_cost'] = self.application.fixed_costs() + model.objective.value
         return results
 
 # Example usage
@@ -220,7 +267,7 @@ if __name__ == "__main__":
     # Create dummy generation profile for example
     generation_profile = pd.Series(
         np.random.uniform(0, 10, 8760),  # 8760 hours in a year
-        index=pd.date_range('2024-01-01', periods=8760, freq='H')
+        index=pd.date_range('2024-01-01', periods=8760, freq='h')
     )
 
     renewable = RenewableGeneratorComponent(
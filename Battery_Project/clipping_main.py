@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from applications.solar_clipping import SolarClippingApp
 from battery_components.battery import BatteryParameters
@@ -7,8 +8,9 @@ from battery_components.grid import GridParameters
 def main():
     # Create price profile (example data)
     time_index = pd.date_range('2023-01-01', periods=8760, freq='h')
+    hours = time_index.hour.values
     price_profile = pd.Series(
-        [100.0 if hour in range(17, 22) else 20.0 for hour in range(24)] * 365,
+        np.where((hours >= 17) & (hours < 22), 100.0, 20.0),
         index=time_index
     )
     
@@ -1,29 +1,28 @@
 import os
 import sys
+import threading
+from contextlib import ExitStack
 import streamlit as st
 import pandas as pd
 import numpy as np
 
-# Add the project root to PYTHONPATH
+# Add the project root to PYTHONPATH; Streamlit re-executes this script on every
+# rerun, so only insert it once
 project_root = os.path.dirname(os.path.abspath(__file__))
-sys.path.insert(0, project_root)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 from applications.solar_clipping import SolarClippingApplication
-st.markdown(
-    """
-    <style>
-    /* Change background color of the sidebar */
-    [data-testid="stSidebar"] {
-        background-color: #cccccf; /* change this to any hex or RGB color */
-    }
-    </style>
-    """,
-    unsafe_allow_html=True
-)
-def main(
+
+# One application per plant configuration, kept across reruns: the generation
+# profile is fetched and the LP built once, while prices and the clip threshold
+# are applied per run. The application is shared by all sessions, so it comes
+# with a lock held for the whole set-solve-read sequence; the least recently
+# used plants are dropped, each holding a year-long LP
+@st.cache_resource(show_spinner=False, max_entries=8)
+def build_app(
     battery_capacity, solar_capacity, inverter_capacity, max_export,
-    discount_rate, peak_price, offpeak_price, latitude, longitude,
-    api_token, start_date, end_date, clip_threshold
+    discount_rate, latitude, longitude, api_token, start_date, end_date
 ):
     app = SolarClippingApplication(
         battery_capacity=battery_capacity,
@@ -31,45 +30,139 @@ def main(
         inverter_capacity=inverter_capacity,
         max_export=max_export,
         discount_rate=discount_rate,
-        peak_price=peak_price,
-        offpeak_price=offpeak_price,
         latitude=latitude,
         longitude=longitude,
         api_token=api_token,
         start_date=start_date,
-        end_date=end_date,
-        clip_threshold=clip_threshold
+        end_date=end_date
+    )
+    return app, threading.Lock()
+
+# Results per full set of inputs, so pressing the button again without changing
+# anything doesn't re-solve. _warm_start_from (left out of the cache key) is the
+# (application, lock) pair of the caller's last solve; HiGHS is seeded with its
+# basis whenever the LP layout matches, even across plant configurations
+@st.cache_data(show_spinner=False, max_entries=32)
+def optimize(
+    battery_capacity, solar_capacity, inverter_capacity, max_export,
+    discount_rate, peak_price, offpeak_price, latitude, longitude,
+    api_token, start_date, end_date, clip_threshold, _warm_start_from=None
+):
+    app, lock = build_app(
+        battery_capacity, solar_capacity, inverter_capacity, max_export,
+        discount_rate, latitude, longitude, api_token, start_date, end_date
+    )
+    with ExitStack() as stack:
+        stack.enter_context(lock)
+        warm_start_from = None
+        if _warm_start_from is not None:
+            source, source_lock = _warm_start_from
+            # Another session solving on the source rewrites its basis file, so
+            # start cold rather than wait for it
+            if source is app:
+                warm_start_from = app
+            elif source_lock.acquire(blocking=False):
+                stack.callback(source_lock.release)
+                warm_start_from = source
+        app.peak_price = peak_price
+        app.offpeak_price = offpeak_price
+        app.clip_threshold = clip_threshold
+        results = app.run_optimization(warm_start_from=warm_start_from)
+        return results, app.get_summary(results), app.grid_params.price_profile
+
+# Charts only need the envelope of a year of hourly data: keep each bucket's
+# minimum and maximum, which cuts the points sent to the browser ~10x
+def downsample(series, max_points=1000):
+    n = len(series)
+    bucket = -(-2 * n // max_points)
+    if bucket <= 1:
+        return series
+    values = series.to_numpy()
+    full = n // bucket * bucket
+    blocks = values[:full].reshape(-1, bucket)
+    starts = np.arange(0, full, bucket)
+    keep = np.unique(np.concatenate([
+        starts + blocks.argmin(axis=1),
+        starts + blocks.argmax(axis=1),
+        np.arange(full, n)
+    ]))
+    return series.iloc[keep]
+
+def main(
+    battery_capacity, solar_capacity, inverter_capacity, max_export,
+    discount_rate, peak_price, offpeak_price, latitude, longitude,
+    api_token, start_date, end_date, clip_threshold
+):
+    app, lock = build_app(
+        battery_capacity, solar_capacity, inverter_capacity, max_export,
+        discount_rate, latitude, longitude, api_token, start_date, end_date
     )
 
     st.subheader("Solar Generation Profile (2023)")
-    generation_profile = app.solar_model.generation_profile
-    st.write(f"Total Annual Generation: {generation_profile.sum():.2f} MWh")
-    st.write(f"Average Daily Generation: {generation_profile.mean():.2f} MW")
-    st.write(f"Peak Generation: {generation_profile.max():.2f} MW")
-    st.area_chart(generation_profile)
+    generation_profile = app.unclipped_generation
+    # Reduce the raw array once; the mean reuses the total
+    generation = generation_profile.to_numpy()
+    total_generation = generation.sum()
+    # One element per section rather than one per line, so each is a single
+    # update to the page
+    st.write(
+        f"Total Annual Generation: {total_generation:.2f} MWh\n\n"
+        f"Average Daily Generation: {total_generation / generation.size:.2f} MW\n\n"
+        f"Peak Generation: {generation.max():.2f} MW"
+    )
+    st.area_chart(downsample(generation_profile))
+
+    # Clipping needs no LP, so it is shown while the optimization still runs
+    clipping = app.clipping_metrics(clip_threshold)
+    st.subheader("Clipping Results")
+    st.write(
+        f"Clipping Threshold: {clipping['threshold']:.2f}\n\n"
+        f"Clipped Energy: {clipping['clipped_energy']:.2f} MWh"
+    )
+
+    # Solve before the price section, so it shows the profile of this run. The
+    # warm-start source is tracked here rather than inside the cached function,
+    # whose body doesn't run on a cache hit
+    results, summary, price_profile = optimize(
+        battery_capacity, solar_capacity, inverter_capacity, max_export,
+        discount_rate, peak_price, offpeak_price, latitude, longitude,
+        api_token, start_date, end_date, clip_threshold,
+        _warm_start_from=st.session_state.get('last_app')
+    )
+    st.session_state['last_app'] = (app, lock)
 
     st.subheader("Price Profile (2023)")
-    price_profile = app.grid_params.price_profile
-    st.write(f"Average Price: ${price_profile.mean():.2f}/MWh")
-    st.write(f"Maximum Price: ${price_profile.max():.2f}/MWh")
-    st.write(f"Minimum Price: ${price_profile.min():.2f}/MWh")
-    st.line_chart(price_profile)
+    prices = price_profile.to_numpy()
+    # Dollar signs escaped, as several in one markdown block would read as LaTeX
+    st.write(
+        f"Average Price: \\${prices.mean():.2f}/MWh\n\n"
+        f"Maximum Price: \\${prices.max():.2f}/MWh\n\n"
+        f"Minimum Price: \\${prices.min():.2f}/MWh"
+    )
+    st.line_chart(downsample(price_profile))
 
-    results = app.run_optimization()
-    summary = app.get_summary(results)
     st.subheader("Optimization Summary")
     st.write(summary)
 
-    if 'clipping' in results:
-        st.subheader("Clipping Results")
-        st.write(f"Clipping Threshold: {results['clipping']['threshold']:.2f}")
-        st.write(f"Clipped Energy: {results['clipping']['clipped_energy']:.2f} MWh")
-
 
 if __name__ == "__main__":
+    # Page styling is emitted only when the app runs, not when the module is imported
+    st.markdown(
+        """
+        <style>
+        /* Change background color of the sidebar */
+        [data-testid="stSidebar"] {
+            background-color: #cccccf; /* change this to any hex or RGB color */
+        }
+        </style>
+        """,
+        unsafe_allow_html=True
+    )
     st.title("Solar Clipping Optimization")
 
-    with st.sidebar:
+    # Inputs are collected in a form, so editing them doesn't rerun the script;
+    # everything is applied at once when the optimization is started
+    with st.sidebar.form("inputs"):
         st.header("Input Parameters")
         solar_capacity = st.number_input("Solar Capacity (MW)", value=20.0)
         inverter_capacity = st.number_input("Inverter Capacity (MW)", value=10.0)
@@ -85,8 +178,9 @@ if __name__ == "__main__":
         start_date = st.date_input("Start Date", value=pd.to_datetime("2023-01-01"))
         end_date = st.date_input("End Date", value=pd.to_datetime("2023-12-31"))
         clip_threshold = st.slider("Clip Threshold (%)", 0.0, 1.0, 0.8)
+        run = st.form_submit_button("Run Optimization")
 
-    if st.button("Run Optimization"):
+    if run:
         main(
             battery_capacity,
             solar_capacity,
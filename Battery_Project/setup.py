@@ -1,13 +1,20 @@
-from setuptools import setup, find_packages
+from setuptools import setup
 
 setup(
     name="battery_project",
     version="0.1",
     packages=["battery_components"],
+    # Parameter dataclasses use slots=True
+    python_requires=">=3.10",
     install_requires=[
         "pandas",
         "numpy",
         "linopy",
         "xarray",
     ],
+    # Solver and UI are opt-in, so library-only installs skip their binaries
+    extras_require={
+        "highs": ["highspy"],
+        "ui": ["streamlit"],
+    },
 ) 
\ No newline at end of file
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Tests import the project modules the way the scripts do, from the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
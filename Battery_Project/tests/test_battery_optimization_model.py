@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from battery_optimization_model import (
+    BatteryComponent,
+    RenewableGeneratorComponent,
+    GridInterfaceComponent,
+    PeakShavingApplication,
+    OptimizationEngine
+)
+
+pytest.importorskip("highspy")
+
+def make_application(hours: int = 48) -> PeakShavingApplication:
+    """Two-day peak shaving setup with a smooth diurnal generation profile"""
+    generation_profile = pd.Series(
+        np.abs(np.sin(np.arange(hours) / 4)) * 5,
+        index=pd.date_range('2024-01-01', periods=hours, freq='h')
+    )
+    return PeakShavingApplication(
+        battery=BatteryComponent(capacity=10.0),
+        renewable=RenewableGeneratorComponent(
+            capacity=10.0,
+            generation_profile=generation_profile,
+            capex_per_mw=1000000,
+            lifetime_years=20,
+            inverter_capacity=5.0
+        ),
+        grid=GridInterfaceComponent(
+            max_export_capacity=10.0,
+            electricity_price_peak=3.0,
+            electricity_price_offpeak=1.0,
+            peak_hours={"morning": [6, 9], "evening": [18, 22]}
+        ),
+        discount_rate=0.08
+    )
+
+def test_fixed_costs_are_reported_not_optimized():
+    application = make_application()
+    results = OptimizationEngine(application).optimize()
+
+    revenue = float((results['export'] * application._create_price_profile(48)).sum())
+    assert results['net_cost'] == pytest.approx(application.fixed_costs() - revenue)
+
+def test_repeated_solves_warm_start():
+    engine = OptimizationEngine(make_application())
+    first = engine.optimize()
+    assert engine._basis_key is not None
+
+    # Second solve starts from the stored basis and lands on the same optimum
+    second = engine.optimize()
+    assert second['net_cost'] == pytest.approx(first['net_cost'])
+    np.testing.assert_allclose(second['export'].values, first['export'].values, atol=1e-6)
+
+def test_warm_start_from_other_engine():
+    source = OptimizationEngine(make_application())
+    source.optimize()
+
+    # Same layout, different prices: the basis carries over, the optimum follows the prices
+    application = make_application()
+    application.grid.electricity_price_peak = 5.0
+    engine = OptimizationEngine(application)
+    warm = engine.optimize(warm_start_from=source)
+    cold = OptimizationEngine(make_application()).optimize()
+    cold_priced = OptimizationEngine(application).optimize()
+    assert warm['net_cost'] == pytest.approx(cold_priced['net_cost'])
+    assert warm['net_cost'] < cold['net_cost']
+
+def test_price_sweep_on_same_application():
+    application = make_application()
+    engine = OptimizationEngine(application)
+    engine.optimize()
+
+    # New prices on the same application and engine keep the LP layout, so the
+    # re-solve starts warm, and must price with them rather than return the
+    # previous optimum
+    application.grid.electricity_price_peak = 5.0
+    application.grid.electricity_price_offpeak = 0.5
+    assert engine._basis_key == engine._topology_key()
+    warm = engine.optimize()
+
+    repriced = make_application()
+    repriced.grid.electricity_price_peak = 5.0
+    repriced.grid.electricity_price_offpeak = 0.5
+    cold = OptimizationEngine(repriced).optimize()
+    assert warm['net_cost'] == pytest.approx(cold['net_cost'])